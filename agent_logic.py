@@ -1,22 +1,51 @@
 import os
 import json
 import httpx
+import openai
 from typing import List, Dict, Any, Optional
 from langchain_openai import ChatOpenAI
-from langchain.agents import AgentExecutor, create_openai_functions_agent
+from langchain.agents import AgentExecutor
+from langchain.agents.format_scratchpad.openai_functions import format_to_openai_function_messages
+from langchain.agents.output_parsers.openai_functions import OpenAIFunctionsAgentOutputParser
+from langchain_core.runnables import RunnablePassthrough
+from langchain_core.utils.function_calling import convert_to_openai_function
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from langchain.tools import tool
 from langchain_community.tools.tavily_search import TavilySearchResults
 import asyncio
+import time
 from datetime import datetime
 from dotenv import load_dotenv
+from observability import (
+    AMADEUS_HTTP, AMADEUS_RETRIES, TracingCallbackHandler, logger as base_logger, setup_logging, span
+)
+from shared_state import RateLimiter, cache_get, cache_set, state
+from health import breakers, monitor
+from warm_start import config_digest, load_artifact, tools_signature
 
 load_dotenv()
+setup_logging()
+logger = base_logger.getChild("agent")
 
 # --- Concurrency Management ---
-# Limits simultaneous Amadeus API calls to 3 to prevent rate limits (429)
+# Limits simultaneous Amadeus API calls to 3 per process to prevent rate limits (429)
 amadeus_semaphore = asyncio.Semaphore(3)
+# Global request budget shared by every worker/replica through the state backend
+amadeus_rate_limiter = RateLimiter("amadeus", limit=int(os.getenv("AMADEUS_RATE_LIMIT", "10")), window=1.0)
+
+# OpenAI errors that mean the upstream itself is unhealthy (vs. a bug in our request)
+OPENAI_UPSTREAM_ERRORS = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+
+# Tools hand the LLM minimal JSON and the rich markdown is rendered once after the run.
+# Set COMPACT_TOOL_OUTPUT=0 to go back to markdown tool results (e.g. to compare token usage).
+COMPACT_TOOL_OUTPUT = os.getenv("COMPACT_TOOL_OUTPUT", "1") == "1"
+VISA_SNIPPET_CHARS = 400
+TRAVEL_REQ_NOTICE = "⚠️ **Important Notice**: These requirements are subject to change and official embassy discretion. We recommend verifying with the consulate before travel."
+
+# Cache lifetimes (seconds); entries live in the shared state backend
+FLIGHT_CACHE_TTL = float(os.getenv("FLIGHT_CACHE_TTL", "300"))
+VISA_CACHE_TTL = float(os.getenv("VISA_CACHE_TTL", "86400"))
 
 # --- Amadeus API Client ---
 
@@ -24,26 +53,95 @@ class AmadeusClient:
     def __init__(self):
         self.client_id = os.getenv("AMADEUS_CLIENT_ID")
         self.client_secret = os.getenv("AMADEUS_CLIENT_SECRET")
-        self.base_url = "https://test.api.amadeus.com"
+        self.base_url = os.getenv("AMADEUS_BASE_URL", "https://test.api.amadeus.com")
         self._token = None
         self._token_expires = 0
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _http(self) -> httpx.AsyncClient:
+        # One pooled client per process keeps TLS connections to Amadeus alive between searches
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=httpx.Timeout(20.0, connect=5.0))
+        return self._client
+
+    async def warm_up(self):
+        """Opens the connection pool and fetches the token before the first search needs it."""
+        if not self._token or asyncio.get_event_loop().time() > self._token_expires:
+            await self._get_token()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    TOKEN_KEY = "amadeus:token"
+    TOKEN_LOCK_KEY = "amadeus:token:lock"
+
+    def _use_token(self, cached: Dict[str, Any]):
+        self._token = cached["access_token"]
+        self._token_expires = asyncio.get_event_loop().time() + (cached["expires_at"] - time.time())
 
     async def _get_token(self):
+        # Reuse a token another worker already fetched
+        cached = await state.get(self.TOKEN_KEY)
+        if cached and cached["expires_at"] > time.time():
+            self._use_token(cached)
+            return
+
+        # Only one worker refreshes; the rest wait for it to publish the new token
+        if await state.set(self.TOKEN_LOCK_KEY, 1, ttl=10, nx=True):
+            try:
+                await self._fetch_token()
+            finally:
+                await state.delete(self.TOKEN_LOCK_KEY)
+            return
+
+        for _ in range(50):
+            await asyncio.sleep(0.1)
+            cached = await state.get(self.TOKEN_KEY)
+            if cached and cached["expires_at"] > time.time():
+                self._use_token(cached)
+                return
+        await self._fetch_token()
+
+    async def _fetch_token(self):
         url = f"{self.base_url}/v1/security/oauth2/token"
         data = {
             "grant_type": "client_credentials",
             "client_id": self.client_id,
             "client_secret": self.client_secret
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, data=data)
+        with span("amadeus.token") as s:
+            response = await self._http().post(url, data=data)
+            s.attrs["code"] = response.status_code
+            AMADEUS_HTTP.labels(endpoint="token", code=str(response.status_code)).inc()
             if response.status_code == 200:
-                self._token = response.json()["access_token"]
-                self._token_expires = asyncio.get_event_loop().time() + response.json()["expires_in"] - 10
+                payload = response.json()
+                ttl = payload["expires_in"] - 10
+                cached = {"access_token": payload["access_token"], "expires_at": time.time() + ttl}
+                await state.set(self.TOKEN_KEY, cached, ttl=ttl)
+                self._use_token(cached)
             else:
                 raise Exception(f"Failed to get Amadeus token: {response.text}")
 
     async def search_flights(self, origin: str, destination: str, date: str, retries: int = 2):
+        # Fail fast while Amadeus is struggling instead of adding retries to its load
+        breaker = breakers["amadeus"]
+        if not breaker.allow():
+            return {"error": f"Flight search is temporarily unavailable. Please retry in {breaker.retry_in():.0f}s."}
+        try:
+            results, upstream_ok = await self._search_flights(origin, destination, date, retries)
+        except BaseException:
+            breaker.record_failure()
+            raise
+        if upstream_ok:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        return results
+
+    async def _search_flights(self, origin: str, destination: str, date: str, retries: int):
+        """Returns (results, upstream_ok); client errors such as a bad date still count as a healthy upstream."""
         for attempt in range(retries + 1):
             try:
                 if not self._token or asyncio.get_event_loop().time() > self._token_expires:
@@ -60,27 +158,37 @@ class AmadeusClient:
                 }
                 headers = {"Authorization": f"Bearer {self._token}"}
                 
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(url, params=params, headers=headers)
-                    if response.status_code == 200:
-                        return response.json()
-                    elif response.status_code == 401: # Token expired
-                        self._token = None
-                        continue
-                    elif response.status_code == 429:
-                        if attempt < retries:
-                            wait_time = 2 ** attempt
-                            print(f"   ⚠️ Rate limited (429). Retrying in {wait_time}s...")
+                with span("amadeus.rate_limit_wait"):
+                    await amadeus_rate_limiter.acquire()
+                with span("amadeus.search", attempt=attempt) as s:
+                    response = await self._http().get(url, params=params, headers=headers)
+                    s.attrs["code"] = response.status_code
+                AMADEUS_HTTP.labels(endpoint="flight-offers", code=str(response.status_code)).inc()
+                if response.status_code == 200:
+                    return response.json(), True
+                elif response.status_code == 401: # Token expired
+                    self._token = None
+                    await state.delete(self.TOKEN_KEY)
+                    AMADEUS_RETRIES.labels(reason="401").inc()
+                    continue
+                elif response.status_code == 429:
+                    if attempt < retries:
+                        wait_time = 2 ** attempt
+                        logger.warning("amadeus rate limited, backing off", extra={"fields": {"attempt": attempt, "wait_s": wait_time}})
+                        AMADEUS_RETRIES.labels(reason="429").inc()
+                        with span("amadeus.backoff", wait_s=wait_time):
                             await asyncio.sleep(wait_time)
-                            continue
-                        return {"error": "Rate limit reached. Please retry in a moment."}
-                    else:
-                        return {"error": f"Amadeus API HTTP {response.status_code}: {response.text[:100]}"}
+                        continue
+                    return {"error": "Rate limit reached. Please retry in a moment."}, False
+                else:
+                    error = {"error": f"Amadeus API HTTP {response.status_code}: {response.text[:100]}"}
+                    return error, response.status_code < 500
             except Exception as e:
                 if attempt < retries:
+                    AMADEUS_RETRIES.labels(reason="exception").inc()
                     continue
-                return {"error": f"Connection Error: {str(e)}"}
-        return {"error": "Maximum retries exceeded."}
+                return {"error": f"Connection Error: {str(e)}"}, False
+        return {"error": "Maximum retries exceeded."}, False
 
 amadeus = AmadeusClient()
 
@@ -108,6 +216,129 @@ def format_duration(iso_duration: str) -> str:
     
     return " ".join(parts) if parts else "Unknown duration"
 
+def _company_config() -> Dict[str, Any]:
+    cfg_path = os.path.join(os.path.dirname(__file__), "config.json")
+    try:
+        with open(cfg_path, "r") as f:
+            return json.load(f)["company"]
+    except Exception:
+        return {"name": "Sunfar Travel", "hotline": "01-8243993", "email": "info@sunfar38.com"}
+
+def _display_date(date: str) -> str:
+    try:
+        return datetime.strptime(date, "%Y-%m-%d").strftime("%d %B %Y")
+    except ValueError:
+        return date
+
+def _group_offers(results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Groups Amadeus offers by carrier into the minimal fields both renderings need."""
+    # Group flights by Carrier for a cleaner "Transit Route" view
+    carrier_groups: Dict[str, List[Dict[str, Any]]] = {}
+    currency_map = {"USD": "$", "EUR": "€", "THB": "฿", "AUD": "A$"}
+    carriers_map = results.get("dictionaries", {}).get("carriers", {})
+    for offer in results["data"][:6]: # Analyze top 6
+        try:
+            currency_code = offer.get("price", {}).get("currency", "USD")
+            currency_symbol = currency_map.get(currency_code, currency_code)
+            price = f"{currency_symbol}{offer.get('price', {}).get('total', 'N/A')}"
+
+            itineraries = offer.get("itineraries", [])
+            if not itineraries: continue
+            itinerary = itineraries[0]
+            duration = itinerary.get("duration", "PT0H0M").replace("PT", "").lower()
+
+            # Extract Transits
+            segments = itinerary.get("segments", [])
+            transits = []
+            if len(segments) > 1:
+                # The transit point is the arrival of the segment before the last one
+                for i in range(len(segments) - 1):
+                    transit_iata = segments[i].get("arrival", {}).get("iataCode")
+                    if transit_iata:
+                        transits.append(transit_iata)
+
+            carrier_code = offer.get("validatingCarrierCodes", [None])[0]
+            if not carrier_code and segments:
+                carrier_code = segments[0].get("carrierCode")
+
+            carrier_name = carriers_map.get(carrier_code, carrier_code) or "Airline"
+            carrier_groups.setdefault(carrier_name, []).append({
+                "price": price,
+                "duration": duration,
+                "transits": transits
+            })
+        except Exception as loop_e:
+            logger.warning("error parsing flight offer", extra={"fields": {"error": str(loop_e)}})
+            continue
+
+    # For each carrier, we might have multiple flight options (different transits/durations)
+    options = []
+    for carrier_name, flights in carrier_groups.items():
+        option = {
+            "carrier": carrier_name,
+            "prices": list(dict.fromkeys(f["price"] for f in flights)),
+            "durations": list(dict.fromkeys(f["duration"] for f in flights))[:2],
+        }
+        via = list(dict.fromkeys(", ".join(f["transits"]) for f in flights if f["transits"]))[:2]
+        if via:
+            option["via"] = via
+        options.append(option)
+    return options
+
+def render_flight_markdown(payload: Dict[str, Any], with_footer: bool = True) -> str:
+    """Rich customer-facing card for a flight_search_tool payload."""
+    header_origin = f"{payload['origin_name']} ({payload['origin']})" if payload.get("origin_name") else payload["origin"]
+    header_dest = f"{payload['destination_name']} ({payload['destination']})" if payload.get("destination_name") else payload["destination"]
+    header = f"✈️ {header_origin} → {header_dest}\n📅 {_display_date(payload['date'])}\n\nAvailable Flights:\n"
+
+    offers = []
+    for option in payload["options"]:
+        carrier_block = [f"**{option['carrier']}**"]
+        carrier_block.append(f"\t•\t💰 {', '.join(option['prices'])}")
+        carrier_block.append(f"\t•\t⏱️ {' or '.join(option['durations'])}")
+        if option.get("via"):
+            carrier_block.append(f"\t•\t🔁 Transit: {' or '.join(option['via'])}")
+        else:
+            carrier_block.append(f"\t•\t🔁 Direct Flight")
+        offers.append("\n".join(carrier_block))
+
+    return header + "\n".join(offers) + (_booking_footer() if with_footer else "")
+
+def _booking_footer() -> str:
+    cfg = _company_config()
+    return f"\n\n**Booking & Support – {cfg['name']}**\n\t•\t📞 Hotline: {cfg['hotline']}\n\t•\t📧 Email: {cfg['email']}\n\n✨ Let us know if you need help with booking or priority travel planning!"
+
+def _compact_search_results(search_results: Any) -> Any:
+    if isinstance(search_results, list):
+        return [
+            {"url": r.get("url"), "content": (r.get("content") or "")[:VISA_SNIPPET_CHARS]}
+            for r in search_results if isinstance(r, dict)
+        ]
+    return str(search_results)[:VISA_SNIPPET_CHARS]
+
+def render_response(output: str, intermediate_steps: List[Any]) -> str:
+    """Adds the rich flight cards and notices that compact tool results left out of the LLM's view."""
+    cards = []
+    seen = set()
+    needs_notice = False
+    for action, observation in intermediate_steps:
+        if not isinstance(observation, str) or observation in seen:
+            continue
+        seen.add(observation)
+        if action.tool == "flight_search_tool" and observation.startswith("{"):
+            try:
+                cards.append(render_flight_markdown(json.loads(observation)["flights"], with_footer=False))
+            except (ValueError, KeyError, TypeError):
+                continue
+        elif action.tool == "travel_req_agent_tool" and observation.startswith("{"):
+            needs_notice = True
+    if not cards and not needs_notice:
+        return output
+    parts = [output] + cards
+    if needs_notice:
+        parts.append(TRAVEL_REQ_NOTICE)
+    return "\n\n".join(parts) + (_booking_footer() if cards else "")
+
 @tool
 async def flight_search_tool(origin: str = "", destination: str = "", date: str = "", origin_name: str = "", destination_name: str = "") -> str:
     """
@@ -115,128 +346,53 @@ async def flight_search_tool(origin: str = "", destination: str = "", date: str
     - origin & destination: REQUIRES 3-letter IATA codes (e.g. BKK, LON).
     - date: YYYY-MM-DD format.
     """
-    print(f"🔍 TOOL: flight_search_tool called with: origin={origin}, dest={destination}, date={date}")
+    logger.info("flight_search_tool called", extra={"fields": {"origin": origin, "destination": destination, "date": date}})
     if not origin or not destination or not date:
-        print("   ⚠️ Tool missing required parameters.")
+        logger.info("flight_search_tool missing required parameters")
         return "✨ To provide exact pricing, please specify the **Origin**, **Destination**, and **Travel Date** (e.g., 'Search flights from RGN to BKK on May 10')."
     
     origin = origin.upper()
     destination = destination.upper()
-    print(f"   Normalized: {origin} -> {destination}")
     try:
-        # Load config for branding
-        cfg_path = os.path.join(os.path.dirname(__file__), "config.json")
-        try:
-            with open(cfg_path, "r") as f:
-                cfg = json.load(f)["company"]
-        except Exception:
-            cfg = {"name": "Sunfar Travel", "hotline": "01-8243993", "email": "info@sunfar38.com"}
-
         # Use semaphore to handle simultaneous users gracefully
-        async with amadeus_semaphore:
-            results = await asyncio.wait_for(amadeus.search_flights(origin, destination, date), timeout=25.0)
+        cache_key = f"{origin}:{destination}:{date}"
+        results = await cache_get("flights", cache_key)
+        if results is None:
+            with span("amadeus.semaphore_wait"):
+                await amadeus_semaphore.acquire()
+            try:
+                results = await asyncio.wait_for(amadeus.search_flights(origin, destination, date), timeout=25.0)
+            finally:
+                amadeus_semaphore.release()
+            if results.get("data"):
+                await cache_set("flights", cache_key, results, ttl=FLIGHT_CACHE_TTL)
         
         if "error" in results:
-            print(f"   ❌ Tool results error: {results['error']}")
+            logger.warning("flight search returned error", extra={"fields": {"error": results["error"]}})
             return f"⚠️ I encountered a temporary technical issue: {results['error']}."
 
         if "data" in results and results["data"]:
-            # Format Date for Display
-            try:
-                dt = datetime.strptime(date, "%Y-%m-%d")
-                display_date = dt.strftime("%d %B %Y")
-            except:
-                display_date = date
-
-            # Header with City Names
-            header_origin = f"{origin_name} ({origin})" if origin_name else origin
-            header_dest = f"{destination_name} ({destination})" if destination_name else destination
-            
-            header = f"✈️ {header_origin} → {header_dest}\n📅 {display_date}\n\nAvailable Flights:\n"
-            # Group flights by Carrier for a cleaner "Transit Route" view
-            carrier_groups = {}
-            currency_map = {"USD": "$", "EUR": "€", "THB": "฿", "AUD": "A$"}
-            carriers_map = results.get("dictionaries", {}).get("carriers", {})
-            for offer in results["data"][:6]: # Analyze top 6
-                try:
-                    currency_code = offer.get("price", {}).get("currency", "USD")
-                    currency_symbol = currency_map.get(currency_code, currency_code)
-                    price = f"{currency_symbol}{offer.get('price', {}).get('total', 'N/A')}"
-                    
-                    itineraries = offer.get("itineraries", [])
-                    if not itineraries: continue
-                    itinerary = itineraries[0]
-                    duration = itinerary.get("duration", "PT0H0M").replace("PT", "").lower()
-                    
-                    # Extract Transits
-                    segments = itinerary.get("segments", [])
-                    transits = []
-                    if len(segments) > 1:
-                        # The transit point is the arrival of the segment before the last one
-                        for i in range(len(segments) - 1):
-                            transit_iata = segments[i].get("arrival", {}).get("iataCode")
-                            if transit_iata:
-                                transits.append(transit_iata)
-                    
-                    carrier_code = offer.get("validatingCarrierCodes", [None])[0]
-                    if not carrier_code and segments:
-                        carrier_code = segments[0].get("carrierCode")
-                    
-                    carrier_name = carriers_map.get(carrier_code, carrier_code) or "Airline"
-                    
-                    if carrier_name not in carrier_groups:
-                        carrier_groups[carrier_name] = []
-                    
-                    carrier_groups[carrier_name].append({
-                        "price": price,
-                        "duration": duration,
-                        "transits": transits
-                    })
-                except Exception as loop_e:
-                    print(f"⚠️ Error parsing flight offer: {loop_e}")
-                    continue
-
-            # Final Building of the Output
-            offers = []
-            for carrier_name, flights in carrier_groups.items():
-                # For each carrier, we might have multiple flight options (different transits/durations)
-                carrier_block = [f"**{carrier_name}**"]
-                
-                # Prices and Durations (concise grouping)
-                prices = list(set([f["price"] for f in flights]))
-                durations = " or ".join(list(set([f["duration"] for f in flights]))[:2])
-                
-                carrier_block.append(f"\t•\t💰 {', '.join(prices)}")
-                carrier_block.append(f"\t•\t⏱️ {durations}")
-                
-                # Transits
-                all_transits = []
-                for f in flights:
-                    if f["transits"]:
-                        all_transits.append(", ".join(f["transits"]))
-                
-                if all_transits:
-                    unique_transits = " or ".join(list(set(all_transits))[:2])
-                    carrier_block.append(f"\t•\t🔁 Transit: {unique_transits}")
-                else:
-                    carrier_block.append(f"\t•\t🔁 Direct Flight")
-                
-                offers.append("\n".join(carrier_block))
-            
-            if not offers:
-                return f"🌍 No available flights found for **{origin}** to **{destination}** on **{display_date}**. Please check alternative dates."
-
-            footer = f"\n\n**Booking & Support – {cfg['name']}**\n\t•\t📞 Hotline: {cfg['hotline']}\n\t•\t📧 Email: {cfg['email']}\n\n✨ Let us know if you need help with booking or priority travel planning!"
-            return header + "\n".join(offers) + footer
+            options = _group_offers(results)
+            if not options:
+                return f"🌍 No available flights found for **{origin}** to **{destination}** on **{_display_date(date)}**. Please check alternative dates."
+
+            payload = {"origin": origin, "destination": destination, "date": date, "options": options}
+            if origin_name:
+                payload["origin_name"] = origin_name
+            if destination_name:
+                payload["destination_name"] = destination_name
+
+            if COMPACT_TOOL_OUTPUT:
+                # The card is rendered once by AirlineAgent after the run; the LLM only needs the facts
+                return json.dumps({"flights": payload}, ensure_ascii=False, separators=(",", ":"))
+            return render_flight_markdown(payload)
         else:
-            return f"❌ No current flights found for **{origin}** to **{destination}** on **{date}**. Please call us at {cfg['hotline']} for offline inventory check."
+            return f"❌ No current flights found for **{origin}** to **{destination}** on **{date}**. Please call us at {_company_config()['hotline']} for offline inventory check."
 
     except asyncio.TimeoutError:
         return "⏳ Search is taking a bit longer than expected. Please retry in a few seconds or call our 24/7 hotline."
     except Exception as e:
-        print(f"   ❌ Tool error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("flight_search_tool failed")
         return f"⚠️ I encountered a technical difficulty. [Error Code: {str(e)[:40]}]"
 
 @tool
@@ -278,6 +434,10 @@ def payment_agent_tool(amount: str) -> str:
 
 tavily_search = TavilySearchResults(k=2)
 
+def _is_search_hit(search_results: Any) -> bool:
+    # TavilySearchResults reports API failures as a string (e.g. repr of the error) instead of raising
+    return isinstance(search_results, list) and bool(search_results) and all(isinstance(r, dict) for r in search_results)
+
 @tool
 async def travel_req_agent_tool(destination: str, citizenship: str = "your current profile") -> str:
     """
@@ -286,10 +446,35 @@ async def travel_req_agent_tool(destination: str, citizenship: str = "your curre
     """
     query = f"official travel visa passport requirements for {citizenship} flying to {destination} in 2026"
     try:
-        search_results = await tavily_search.ainvoke(query)
-        return f"🌍 **Official Global Requirements for {destination}**:\n\n{search_results}\n\n⚠️ **Important Notice**: These requirements are subject to change and official embassy discretion. We recommend verifying with the consulate before travel."
+        cache_key = f"{citizenship}:{destination}".lower()
+        search_results = await cache_get("visa", cache_key)
+        if search_results is None:
+            breaker = breakers["tavily"]
+            breaker.check()
+            try:
+                search_results = await tavily_search.ainvoke(query)
+            except Exception:
+                breaker.record_failure()
+                raise
+            except BaseException:
+                # Cancelled (request timeout, client gone): free the half-open trial slot
+                breaker.release()
+                raise
+            if isinstance(search_results, str):
+                # An error string is an upstream failure even though nothing was raised
+                breaker.record_failure()
+                raise RuntimeError(search_results[:120] or "Tavily error")
+            breaker.record_success()
+            if not _is_search_hit(search_results):
+                raise RuntimeError("no results")
+            await cache_set("visa", cache_key, search_results, ttl=VISA_CACHE_TTL)
+        if COMPACT_TOOL_OUTPUT:
+            # The notice is appended once to the final reply by render_response
+            requirements = {"destination": destination, "sources": _compact_search_results(search_results)}
+            return json.dumps({"requirements": requirements}, ensure_ascii=False, separators=(",", ":"))
+        return f"🌍 **Official Global Requirements for {destination}**:\n\n{search_results}\n\n{TRAVEL_REQ_NOTICE}"
     except Exception as e:
-        print(f"   ❌ Tool error: {str(e)}")
+        logger.warning("travel_req_agent_tool failed", extra={"fields": {"error": str(e)}})
         return f"⚠️ High-Accuracy Search Error: {str(e)}. Please manually verify current visa rules for {destination}."
 
 @tool
@@ -298,6 +483,7 @@ async def internal_diagnostic_tool() -> str:
     Check the internal health and connectivity of the Airline Assistant.
     Use this if a search fails or if device discrepancies are reported.
     """
+    # Reads the background health cache only; never calls upstream services itself
     try:
         report = ["🔍 --- INTERNAL SYSTEM DIAGNOSTIC ---"]
         
@@ -311,15 +497,13 @@ async def internal_diagnostic_tool() -> str:
         token_status = "Active" if amadeus._token and amadeus._token_expires > asyncio.get_event_loop().time() else "Expired/None"
         report.append(f"🎫 Amadeus Token: {token_status}")
         
-        # 3. Test Handshake
-        try:
-            test = await amadeus.search_flights("RGN", "BKK", "2026-03-10", retries=0)
-            if "data" in test:
-                report.append(f"✈️ Amadeus Handshake: SUCCESS (Found {len(test['data'])} flights)")
+        # 3. Upstream Health (cached probes + circuit breakers)
+        for name, result in monitor.snapshot().items():
+            if result["ok"] is None:
+                icon = "⏳"
             else:
-                report.append(f"⚠️ Amadeus Handshake: NO DATA / ERROR ({test.get('error', 'Unknown')})")
-        except Exception as e:
-            report.append(f"❌ Amadeus Handshake: FAILED ({str(e)[:50]})")
+                icon = "✅" if result["ok"] and result["circuit"] == "closed" else "⚠️"
+            report.append(f"{icon} {name}: {result['detail']} | circuit {result['circuit']}")
             
         report.append("🏁 --- DIAGNOSTIC COMPLETE ---")
         return "\n".join(report)
@@ -340,17 +524,46 @@ tools = [
 
 # --- Core Agent Class ---
 
+COMPACT_TOOL_DIRECTIVE = """
+
+## Tool Results
+Flight and travel-requirement tools return compact JSON. The full flight card (prices, durations, transits, booking contacts) and the embassy notice are shown to the customer automatically below your reply, so do not re-list every flight or repeat contact details; summarize the best options and suggest next steps."""
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "config.json")
+
 class AirlineAgent:
     def __init__(self, model_name: str = "gpt-4-turbo-preview"):
         self.llm = ChatOpenAI(model=model_name, temperature=0.7)
+        # Precomputed by `python warm_start.py build`; each part is used only if still current
+        self._artifact = load_artifact() or {}
+        self._prompt_cache: Optional[tuple] = None
+        self._seed_prompt_cache()
         self.agent_executor = self._create_agent()
 
+    def _seed_prompt_cache(self):
+        artifact = self._artifact
+        if not artifact.get("system_prompt") or artifact.get("compact_tool_output") != COMPACT_TOOL_OUTPUT:
+            return
+        if artifact.get("config_digest") != config_digest():
+            return
+        try:
+            self._prompt_cache = (os.stat(CONFIG_PATH).st_mtime, artifact["system_prompt"])
+        except OSError:
+            pass
+
     def _get_dynamic_system_prompt(self) -> str:
-        import json
-        import os
-        cfg_path = os.path.join(os.path.dirname(__file__), "config.json")
+        # Rebuilt only when config.json changes, so edits still apply on the next request
+        try:
+            mtime = os.stat(CONFIG_PATH).st_mtime
+        except OSError:
+            return self._build_system_prompt()
+        if self._prompt_cache is None or self._prompt_cache[0] != mtime:
+            self._prompt_cache = (mtime, self._build_system_prompt())
+        return self._prompt_cache[1]
+
+    def _build_system_prompt(self) -> str:
         try:
-            with open(cfg_path, "r") as f:
+            with open(CONFIG_PATH, "r") as f:
                 cfg = json.load(f)
         except Exception:
             return "You are an official AI concierge for Sunfar Travel."
@@ -384,7 +597,18 @@ You are the official AI concierge for **{cfg['company']['name']}**. Your purpose
 - **Vibe**: Elite, thorough, and high-accuracy.
 - **Format**: Use bullet points and headers for clear, beautiful structure.
 
-Always use tools for live data. Be the digital face of {cfg['company']['name']}."""
+Always use tools for live data. Be the digital face of {cfg['company']['name']}.""" + (COMPACT_TOOL_DIRECTIVE if COMPACT_TOOL_OUTPUT else "")
+
+    def _tool_schemas(self) -> List[Dict[str, Any]]:
+        if self._artifact.get("tools_signature") == tools_signature(tools):
+            return self._artifact["tool_schemas"]
+        return [convert_to_openai_function(t) for t in tools]
+
+    async def warm_up(self):
+        """Opens the OpenAI connection pool with a free models.list call."""
+        client = getattr(self.llm, "root_async_client", None)
+        if client is not None:
+            await client.models.list()
 
     def _create_agent(self) -> AgentExecutor:
         prompt = ChatPromptTemplate.from_messages([
@@ -393,20 +617,48 @@ Always use tools for live data. Be the digital face of {cfg['company']['name']}.
             ("human", "{input}"),
             MessagesPlaceholder(variable_name="agent_scratchpad"),
         ])
-        agent = create_openai_functions_agent(self.llm, tools, prompt)
-        return AgentExecutor(agent=agent, tools=tools, verbose=True, handle_tool_error=True)
-
-    async def analyze_input(self, text: str) -> Dict[str, str]:
+        # Same pipeline as create_openai_functions_agent, but able to reuse precomputed schemas
+        agent = (
+            RunnablePassthrough.assign(
+                agent_scratchpad=lambda x: format_to_openai_function_messages(x["intermediate_steps"])
+            )
+            | prompt
+            | self.llm.bind(functions=self._tool_schemas())
+            | OpenAIFunctionsAgentOutputParser()
+        )
+        # verbose tracing writes synchronously to stdout on every step; keep it opt-in
+        verbose = os.getenv("AGENT_VERBOSE", "0") == "1"
+        return AgentExecutor(
+            agent=agent, tools=tools, verbose=verbose, handle_tool_error=True, return_intermediate_steps=True
+        )
+
+    async def analyze_input(self, text: str, callbacks: Optional[list] = None) -> Dict[str, str]:
         """Pre-processes input to detect language and sentiment."""
         analysis_prompt = f"Analyze language (ISO 639-1) and sentiment (positive, neutral, frustrated, urgent) of this message: '{text}'. Return ONLY JSON like {{\"language\": \"en\", \"sentiment\": \"neutral\"}}"
-        response = await self.llm.ainvoke(analysis_prompt)
+        with span("analyze_input"):
+            response = await self.llm.ainvoke(analysis_prompt, config={"callbacks": callbacks or []})
         try:
             return json.loads(response.content)
         except:
             return {"language": "en", "sentiment": "neutral"}
 
     async def get_response(self, text: str, history: List[Dict[str, str]] = []) -> str:
-        analysis = await self.analyze_input(text)
+        breaker = breakers["openai"]
+        breaker.check()
+        try:
+            output = await self._get_response(text, history)
+        except OPENAI_UPSTREAM_ERRORS:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.record_success()
+        return output
+
+    async def _get_response(self, text: str, history: List[Dict[str, str]]) -> str:
+        callbacks = [TracingCallbackHandler(tool_output_mode="compact" if COMPACT_TOOL_OUTPUT else "markdown")]
+        analysis = await self.analyze_input(text, callbacks)
         
         # Convert history format
         formatted_history = []
@@ -418,12 +670,15 @@ Always use tools for live data. Be the digital face of {cfg['company']['name']}.
 
         dynamic_prompt = self._get_dynamic_system_prompt()
 
-        result = await self.agent_executor.ainvoke({
-            "input": text,
-            "chat_history": formatted_history,
-            "system_prompt": dynamic_prompt
-        })
-        
+        with span("agent_executor"):
+            result = await self.agent_executor.ainvoke({
+                "input": text,
+                "chat_history": formatted_history,
+                "system_prompt": dynamic_prompt
+            }, config={"callbacks": callbacks})
+
+        if COMPACT_TOOL_OUTPUT:
+            return render_response(result["output"], result.get("intermediate_steps", []))
         return result["output"]
 
 # Initialize instance
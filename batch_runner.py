@@ -0,0 +1,220 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+from agent_logic import agent
+from observability import percentile
+from warm_start import save_cache_snapshot
+
+# --- Batch Query Mode ---
+# Streams a JSONL file of conversations through AirlineAgent.get_response.
+# Input lines: {"id": "...", "message": "...", "history": [{"role": ..., "content": ...}]}
+# Output lines: one result per input line, appended as soon as it completes.
+# Amadeus calls still pass through the global rate limiter and semaphore in
+# agent_logic, so --concurrency only bounds how many conversations are in flight.
+
+LATENCY_SAMPLE_SIZE = 10000
+
+
+class Checkpoint:
+    """
+    Tracks a watermark: every input line below `next_line` has a result on disk.
+    Lines finished out of order are held until the gap closes, so memory stays
+    bounded by the concurrency window rather than the file size.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.next_line = 0
+        self._done: Set[int] = set()
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self.next_line = json.load(f)["next_line"]
+
+    def mark(self, line_no: int):
+        self._done.add(line_no)
+        while self.next_line in self._done:
+            self._done.remove(self.next_line)
+            self.next_line += 1
+
+    def save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"next_line": self.next_line}, f)
+        os.replace(tmp, self.path)
+
+
+class Stats:
+    def __init__(self):
+        self.ok = 0
+        self.errors = 0
+        self.skipped = 0
+        self.start = time.perf_counter()
+        self._latencies: List[float] = []
+        self._seen = 0
+
+    def record(self, latency: float, ok: bool):
+        if ok:
+            self.ok += 1
+        else:
+            self.errors += 1
+        # Reservoir sample keeps percentile memory fixed on very large runs
+        self._seen += 1
+        if len(self._latencies) < LATENCY_SAMPLE_SIZE:
+            self._latencies.append(latency)
+        else:
+            slot = random.randrange(self._seen)
+            if slot < LATENCY_SAMPLE_SIZE:
+                self._latencies[slot] = latency
+
+    def percentile(self, pct: float) -> float:
+        return percentile(self._latencies, pct)
+
+    def summary(self) -> str:
+        elapsed = time.perf_counter() - self.start
+        done = self.ok + self.errors
+        rate = done / elapsed if elapsed else 0.0
+        return (
+            f"✅ {self.ok} ok  ❌ {self.errors} errors  ⏭️ {self.skipped} skipped  "
+            f"| {rate:.2f} conv/s  p50 {self.percentile(50):.2f}s  p95 {self.percentile(95):.2f}s  "
+            f"| {elapsed:.1f}s elapsed"
+        )
+
+
+def read_conversations(path: str, start_line: int) -> Iterator[Tuple[int, str]]:
+    """Yields (line_no, raw line); blank and malformed lines still come through so they advance the checkpoint."""
+    with open(path, "r") as f:
+        for line_no, line in enumerate(f):
+            if line_no < start_line:
+                continue
+            yield line_no, line.strip()
+
+
+def completed_lines(output_path: str, start_line: int) -> Set[int]:
+    """Results written past the checkpoint watermark before an interruption."""
+    done: Set[int] = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r") as f:
+        for line in f:
+            try:
+                line_no = json.loads(line)["line"]
+            except (ValueError, KeyError):
+                continue  # Partially written final line from a crash
+            if line_no >= start_line:
+                done.add(line_no)
+    return done
+
+
+async def run_batch(input_path: str, output_path: str, concurrency: int = 4, timeout: float = 60.0,
+                    checkpoint_every: int = 25, progress_every: int = 50, resume: bool = True) -> Stats:
+    checkpoint_path = f"{output_path}.ckpt"
+    if not resume:
+        for path in [output_path, checkpoint_path]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    checkpoint = Checkpoint(checkpoint_path)
+    already_done = completed_lines(output_path, checkpoint.next_line)
+    stats = Stats()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    if checkpoint.next_line:
+        print(f"↩️  Resuming from line {checkpoint.next_line} ({len(already_done)} later lines already done)")
+
+    with open(output_path, "a") as out:
+
+        def write_result(line_no: int, record: Dict[str, Any]):
+            out.write(json.dumps({"line": line_no, **record}, ensure_ascii=False) + "\n")
+            out.flush()
+            checkpoint.mark(line_no)
+            done = stats.ok + stats.errors
+            if done % checkpoint_every == 0:
+                checkpoint.save()
+            if done % progress_every == 0:
+                print(stats.summary())
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                line_no, convo = item
+                start = time.perf_counter()
+                try:
+                    response = await asyncio.wait_for(
+                        agent.get_response(convo["message"], convo.get("history", [])), timeout=timeout
+                    )
+                    record = {"id": convo.get("id"), "response": response, "status": "success"}
+                except asyncio.TimeoutError:
+                    record = {"id": convo.get("id"), "response": None, "status": "error", "error": "timeout"}
+                except Exception as e:
+                    record = {"id": convo.get("id"), "response": None, "status": "error", "error": str(e)}
+                latency = time.perf_counter() - start
+                record["latency_ms"] = round(latency * 1000, 1)
+                stats.record(latency, record["status"] == "success")
+                write_result(line_no, record)
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            for line_no, line in read_conversations(input_path, checkpoint.next_line):
+                if not line:
+                    checkpoint.mark(line_no)
+                    continue
+                if line_no in already_done:
+                    stats.skipped += 1
+                    checkpoint.mark(line_no)
+                    continue
+                try:
+                    convo = json.loads(line)
+                except ValueError:
+                    # One bad line is reported like any other failed conversation, not fatal to the run
+                    stats.errors += 1
+                    write_result(line_no, {"status": "error", "error": "invalid json"})
+                    continue
+                await queue.put((line_no, convo))
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for w in workers:
+                w.cancel()
+            checkpoint.save()
+
+    # Leaves the flight/visa results behind for the next server start (a no-op on Redis, which already keeps them)
+    saved = await save_cache_snapshot()
+    if saved:
+        print(f"🔥 Saved {saved} cache entries for server warm start")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a JSONL file of customer queries through the concierge.")
+    parser.add_argument("input", help="JSONL file of conversations")
+    parser.add_argument("output", help="JSONL file to append results to")
+    parser.add_argument("--concurrency", type=int, default=4, help="Conversations in flight at once")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds allowed per conversation")
+    parser.add_argument("--checkpoint-every", type=int, default=25)
+    parser.add_argument("--progress-every", type=int, default=50)
+    parser.add_argument("--fresh", action="store_true", help="Ignore previous output/checkpoint and start over")
+    args = parser.parse_args()
+
+    print(f"📦 Batch run: {args.input} → {args.output} (concurrency {args.concurrency})")
+    try:
+        stats = asyncio.run(run_batch(
+            args.input, args.output, args.concurrency, args.timeout,
+            args.checkpoint_every, args.progress_every, resume=not args.fresh
+        ))
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrupted. Progress is checkpointed; re-run the same command to resume.")
+        sys.exit(130)
+    print(stats.summary())
+
+
+if __name__ == "__main__":
+    main()
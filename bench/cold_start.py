@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+import signal
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List
+
+import httpx
+
+from bench.run_bench import BENCH_DIR, ROOT, _free_port, _spawn, _wait_for_port
+
+# --- Time-to-First-Successful-Chat ---
+# Boots a fresh server process repeatedly and times spawn -> first successful
+# /chat, with warm start disabled ("cold") and enabled ("warm"). The warm run
+# uses a freshly built artifact and a cache snapshot left by a priming server.
+
+PROBE_MESSAGE = {"message": "Search flights from RGN to BKK on 2026-03-10", "history": []}
+
+
+def _first_success(port: int, proc: subprocess.Popen, timeout: float = 120.0) -> float:
+    start = time.perf_counter()
+    deadline = start + timeout
+    with httpx.Client(timeout=90.0) as client:
+        while time.perf_counter() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"Server exited early with code {proc.returncode}")
+            try:
+                response = client.post(f"http://127.0.0.1:{port}/chat", json=PROBE_MESSAGE)
+                if response.status_code == 200 and response.json().get("status") == "success":
+                    return time.perf_counter()
+            except httpx.TransportError:
+                pass
+            time.sleep(0.05)
+    raise TimeoutError("No successful chat before timeout")
+
+
+def _stop(proc: subprocess.Popen):
+    # SIGINT lets uvicorn run the shutdown hooks, which write the cache snapshot
+    proc.send_signal(signal.SIGINT)
+    try:
+        proc.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def _boot(env: Dict[str, str], amadeus_port: int, llm_latency: float) -> float:
+    port = _free_port()
+    spawned = time.perf_counter()
+    proc = _spawn([
+        "bench.serve_app", "--port", str(port),
+        "--amadeus-url", f"http://127.0.0.1:{amadeus_port}", "--llm-latency", str(llm_latency),
+    ], env)
+    try:
+        return _first_success(port, proc) - spawned
+    finally:
+        _stop(proc)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold vs warm time-to-first-successful-chat.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--amadeus-latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    artifact = os.path.join(BENCH_DIR, ".warm_start.json")
+    snapshot = os.path.join(BENCH_DIR, ".cache_snapshot.json")
+    base_env = {**os.environ, "PYTHONPATH": ROOT, "LOG_LEVEL": "WARNING"}
+    base_env.pop("STATE_BACKEND_URL", None)
+    for key in ["OPENAI_API_KEY", "TAVILY_API_KEY", "AMADEUS_CLIENT_ID", "AMADEUS_CLIENT_SECRET"]:
+        base_env.setdefault(key, "bench")
+    cold_env = {**base_env, "WARM_START": "0"}
+    warm_env = {**base_env, "WARM_START": "1", "WARM_START_ARTIFACT": artifact, "WARM_CACHE_SNAPSHOT": snapshot}
+
+    amadeus_port = _free_port()
+    mock = _spawn(["bench.mock_amadeus", "--port", str(amadeus_port), "--latency", str(args.amadeus_latency)], base_env)
+    results: Dict[str, List[float]] = {"cold": [], "warm": []}
+    try:
+        _wait_for_port(amadeus_port, mock)
+
+        print("🛠️  Building warm start artifact...")
+        subprocess.run([sys.executable, "warm_start.py", "build"], cwd=ROOT, env={**warm_env, "WARM_START": "0"},
+                       check=True, stdout=subprocess.DEVNULL)
+        print("🔥 Priming cache snapshot...")
+        _boot(warm_env, amadeus_port, args.llm_latency)
+
+        for i in range(args.runs):
+            results["cold"].append(_boot(cold_env, amadeus_port, args.llm_latency))
+            results["warm"].append(_boot(warm_env, amadeus_port, args.llm_latency))
+            print(f"   run {i + 1}: cold {results['cold'][-1]:.2f}s  warm {results['warm'][-1]:.2f}s")
+    finally:
+        _stop(mock)
+        for path in [artifact, snapshot]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    cold, warm = statistics.median(results["cold"]), statistics.median(results["warm"])
+    print(f"\n⏱️  Time to first successful chat (median of {args.runs})")
+    print(f"  cold   {cold:.2f}s")
+    print(f"  warm   {warm:.2f}s   ({(cold - warm) / cold:.0%} faster)" if cold else f"  warm   {warm:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import re
+import json
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, FunctionMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# --- Deterministic Fake Chat Model ---
+# Each rule maps a regex on the user's message to a tool call. Named groups are
+# substituted into the arguments, and "{input}" is replaced by the whole message.
+DEFAULT_SCRIPT: List[Dict[str, Any]] = [
+    {
+        "pattern": r"from (?P<origin>[A-Z]{3}) to (?P<destination>[A-Z]{3}) on (?P<date>\d{4}-\d{2}-\d{2})",
+        "tool": "flight_search_tool",
+        "args": {"origin": "{origin}", "destination": "{destination}", "date": "{date}"},
+    },
+    {"pattern": r"(?i)baggage|luggage", "tool": "baggage_agent_tool", "args": {"query": "{input}"}},
+    {"pattern": r"(?i)check.?in|boarding", "tool": "checkin_agent_tool", "args": {"query": "{input}"}},
+    {"pattern": r"(?i)status|delay", "tool": "status_agent_tool", "args": {"flight_id": "AB123"}},
+    {"pattern": r"(?i)miles|loyalty", "tool": "loyalty_agent_tool", "args": {"user_id": "default_user"}},
+]
+
+
+def _estimate_tokens(text: str) -> int:
+    # Rough OpenAI average of ~4 characters per token; good enough for relative comparisons
+    return max(1, len(text) // 4)
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Offline stand-in for ChatOpenAI. Answers `analyze_input` with fixed JSON, emits
+    the scripted function call for the first matching rule, then echoes the tool output.
+    """
+
+    script: List[Dict[str, Any]] = DEFAULT_SCRIPT
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def _tool_call(self, text: str) -> Optional[Dict[str, Any]]:
+        for rule in self.script:
+            match = re.search(rule["pattern"], text)
+            if match:
+                values = {"input": text, **match.groupdict()}
+                args = {k: v.format(**values) for k, v in rule["args"].items()}
+                return {"name": rule["tool"], "arguments": json.dumps(args)}
+        return None
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        last = messages[-1]
+        additional_kwargs: Dict[str, Any] = {}
+        if isinstance(last, HumanMessage) and "Analyze language" in str(last.content):
+            content = json.dumps({"language": "en", "sentiment": "neutral"})
+        elif isinstance(last, FunctionMessage):
+            content = f"Here is what I found for you:\n\n{last.content}"
+        else:
+            user_text = next((str(m.content) for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+            call = self._tool_call(user_text)
+            if call:
+                content = ""
+                additional_kwargs["function_call"] = call
+            else:
+                content = "✨ How may I assist you with your travels today?"
+
+        prompt_tokens = sum(_estimate_tokens(str(m.content)) for m in messages)
+        completion_tokens = _estimate_tokens(content or json.dumps(additional_kwargs))
+        message = AIMessage(content=content, additional_kwargs=additional_kwargs)
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output={
+                "model_name": self._llm_type,
+                "token_usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            },
+        )
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs) -> ChatResult:
+        return self._respond(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(messages)
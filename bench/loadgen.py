@@ -0,0 +1,117 @@
+import json
+import time
+import asyncio
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+
+from observability import percentile
+
+# --- Open-Loop Load Generator ---
+# Requests are launched on a fixed schedule regardless of how fast earlier ones
+# finish, so queueing inside the server shows up in the latency percentiles.
+
+
+def load_traces(path: str) -> List[Dict[str, Any]]:
+    """Reads conversation traces: one {"message": ..., "history": [...]} object per line."""
+    traces = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entry = json.loads(line)
+                traces.append({"message": entry["message"], "history": entry.get("history", [])})
+    if not traces:
+        raise ValueError(f"No conversation traces found in {path}")
+    return traces
+
+
+def _cycle(traces: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    while True:
+        yield from traces
+
+
+async def _send(client: httpx.AsyncClient, url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        response = await client.post(url, json=payload)
+        ok = response.status_code == 200 and response.json().get("status") == "success"
+        if ok:
+            error = None
+        else:
+            error = "agent_error" if response.status_code == 200 else f"HTTP {response.status_code}"
+    except Exception as e:
+        ok, error = False, type(e).__name__
+    return {"latency": time.perf_counter() - start, "ok": ok, "error": error}
+
+
+async def run_load(base_url: str, traces: List[Dict[str, Any]], rps: float, duration: float, timeout: float = 90.0) -> Dict[str, Any]:
+    total = max(1, int(rps * duration))
+    source = _cycle(traces)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        tasks = []
+        for i in range(total):
+            delay = start + i / rps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(_send(client, f"{base_url}/chat", next(source))))
+        results = await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    return summarize(results, elapsed, rps)
+
+
+def summarize(results: List[Dict[str, Any]], elapsed: float, rps: float) -> Dict[str, Any]:
+    latencies = [r["latency"] for r in results if r["ok"]]
+    errors: Dict[str, int] = {}
+    for r in results:
+        if not r["ok"]:
+            errors[r["error"]] = errors.get(r["error"], 0) + 1
+    return {
+        "target_rps": rps,
+        "requests": len(results),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "error_rate": (len(results) - len(latencies)) / len(results) if results else 0.0,
+        "errors": errors,
+    }
+
+# --- Baseline Comparison ---
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    """Returns a human-readable line per metric that regressed beyond `tolerance`."""
+    regressions = []
+    for key in ["p50", "p95", "p99"]:
+        if baseline.get(key) and report[key] > baseline[key] * (1 + tolerance):
+            regressions.append(f"{key}: {report[key] * 1000:.0f}ms vs baseline {baseline[key] * 1000:.0f}ms")
+    if baseline.get("throughput") and report["throughput"] < baseline["throughput"] * (1 - tolerance):
+        regressions.append(f"throughput: {report['throughput']:.2f}/s vs baseline {baseline['throughput']:.2f}/s")
+    if report["error_rate"] > baseline.get("error_rate", 0.0) + 0.01:
+        regressions.append(f"error_rate: {report['error_rate']:.1%} vs baseline {baseline.get('error_rate', 0.0):.1%}")
+    return regressions
+
+
+def format_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    def row(label: str, key: str, fmt) -> str:
+        line = f"  {label:<12} {fmt(report[key]):>12}"
+        if baseline and key in baseline:
+            line += f"   (baseline {fmt(baseline[key])})"
+        return line
+
+    ms = lambda v: f"{v * 1000:.0f} ms"
+    lines = [
+        f"📊 {report['requests']} requests @ {report['target_rps']} rps",
+        row("p50", "p50", ms),
+        row("p95", "p95", ms),
+        row("p99", "p99", ms),
+        row("throughput", "throughput", lambda v: f"{v:.2f} /s"),
+        row("error rate", "error_rate", lambda v: f"{v:.1%}"),
+    ]
+    if report["errors"]:
+        lines.append(f"  errors       {report['errors']}")
+    return "\n".join(lines)
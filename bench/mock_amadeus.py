@@ -0,0 +1,67 @@
+import random
+import asyncio
+import argparse
+import uvicorn
+from fastapi import FastAPI, Form, Query
+from fastapi.responses import JSONResponse
+
+# --- Local Mock of the Amadeus Self-Service API ---
+# Implements just the two endpoints AmadeusClient uses, with tunable latency,
+# 429 rate and payload size so benchmarks never leave the machine.
+
+CARRIERS = {"8M": "MYANMAR AIRWAYS INTL", "TG": "THAI AIRWAYS", "SQ": "SINGAPORE AIRLINES", "PG": "BANGKOK AIRWAYS", "AK": "AIRASIA"}
+HUBS = ["BKK", "SIN", "KUL", "HKG"]
+
+
+def build_app(latency: float = 0.2, jitter: float = 0.05, rate_429: float = 0.0, offers: int = 5, seed: int = 42) -> FastAPI:
+    app = FastAPI(title="Mock Amadeus")
+    rng = random.Random(seed)
+
+    async def _delay():
+        await asyncio.sleep(max(0.0, latency + rng.uniform(-jitter, jitter)))
+
+    @app.post("/v1/security/oauth2/token")
+    async def token(grant_type: str = Form(...), client_id: str = Form(""), client_secret: str = Form("")):
+        await _delay()
+        return {"access_token": "mock-token", "token_type": "Bearer", "expires_in": 1799}
+
+    @app.get("/v2/shopping/flight-offers")
+    async def flight_offers(originLocationCode: str, destinationLocationCode: str, departureDate: str, max_results: int = Query(5, alias="max")):
+        await _delay()
+        if rng.random() < rate_429:
+            return JSONResponse(status_code=429, content={"errors": [{"status": 429, "title": "Too many requests"}]})
+
+        # `offers` deliberately overrides `max` so payload size can be pushed past the real cap
+        data = []
+        for i in range(offers):
+            carrier = rng.choice(list(CARRIERS))
+            segments = [{"carrierCode": carrier, "departure": {"iataCode": originLocationCode}, "arrival": {"iataCode": destinationLocationCode}}]
+            if i % 2:
+                hub = rng.choice(HUBS)
+                segments = [
+                    {"carrierCode": carrier, "departure": {"iataCode": originLocationCode}, "arrival": {"iataCode": hub}},
+                    {"carrierCode": carrier, "departure": {"iataCode": hub}, "arrival": {"iataCode": destinationLocationCode}},
+                ]
+            data.append({
+                "id": str(i + 1),
+                "price": {"currency": "USD", "total": f"{rng.randint(90, 900)}.00"},
+                "validatingCarrierCodes": [carrier],
+                "itineraries": [{"duration": f"PT{rng.randint(1, 14)}H{rng.randint(0, 59)}M", "segments": segments}],
+            })
+        return {"meta": {"count": len(data)}, "data": data, "dictionaries": {"carriers": CARRIERS}}
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local mock Amadeus API.")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.2, help="Mean response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Uniform +/- jitter in seconds")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Probability of answering 429")
+    parser.add_argument("--offers", type=int, default=5, help="Flight offers per response (payload size)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    app = build_app(args.latency, args.jitter, args.rate_429, args.offers, args.seed)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
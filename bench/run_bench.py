@@ -0,0 +1,115 @@
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+from typing import List
+
+from bench.loadgen import compare, format_report, load_traces, run_load
+
+# --- Offline Benchmark Runner ---
+# Starts the mock Amadeus API and server.py (with the scripted LLM) as separate
+# processes, replays conversation traces at a target RPS and checks the result
+# against a stored baseline. No network or API keys are needed.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "bench")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(port: int, proc: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Process exited early with code {proc.returncode}: {' '.join(proc.args)}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"Nothing listening on port {port} after {timeout}s")
+
+
+def _spawn(args: List[str], env: dict) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-m", *args], cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the Airline Assistant.")
+    parser.add_argument("--rps", type=float, default=5.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load to generate")
+    parser.add_argument("--traces", default=os.path.join(BENCH_DIR, "traces.jsonl"))
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per fake LLM call")
+    parser.add_argument("--amadeus-latency", type=float, default=0.2, help="Mean mock Amadeus latency in seconds")
+    parser.add_argument("--amadeus-429-rate", type=float, default=0.0, help="Probability the mock answers 429")
+    parser.add_argument("--offers", type=int, default=5, help="Flight offers per mock response")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the flight cache so every search hits the mock")
+    parser.add_argument("--baseline", default=os.path.join(BENCH_DIR, "baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression vs baseline")
+    args = parser.parse_args()
+
+    traces = load_traces(args.traces)
+    amadeus_port, server_port = _free_port(), _free_port()
+
+    env = {**os.environ, "PYTHONPATH": ROOT, "LOG_LEVEL": "WARNING"}
+    env.pop("STATE_BACKEND_URL", None)
+    if args.no_cache:
+        env["FLIGHT_CACHE_TTL"] = "0"
+
+    procs = []
+    try:
+        procs.append(_spawn([
+            "bench.mock_amadeus", "--port", str(amadeus_port),
+            "--latency", str(args.amadeus_latency), "--rate-429", str(args.amadeus_429_rate),
+            "--offers", str(args.offers),
+        ], env))
+        _wait_for_port(amadeus_port, procs[-1])
+
+        procs.append(_spawn([
+            "bench.serve_app", "--port", str(server_port),
+            "--amadeus-url", f"http://127.0.0.1:{amadeus_port}", "--llm-latency", str(args.llm_latency),
+        ], env))
+        _wait_for_port(server_port, procs[-1])
+
+        print(f"🚀 Replaying {len(traces)} traces at {args.rps} rps for {args.duration}s...")
+        report = asyncio.run(run_load(f"http://127.0.0.1:{server_port}", traces, args.rps, args.duration))
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait()
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+
+    print(format_report(report, baseline))
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+        return
+
+    if baseline:
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("❌ Performance regression detected:")
+            for line in regressions:
+                print(f"   • {line}")
+            sys.exit(1)
+        print("✅ Within tolerance of baseline.")
+
+
+if __name__ == "__main__":
+    main()
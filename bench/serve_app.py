@@ -0,0 +1,35 @@
+import os
+import argparse
+import uvicorn
+
+# --- server.py Wired to the Offline Fakes ---
+# Runs the real FastAPI app and agent graph, but with the scripted chat model
+# and AmadeusClient pointed at bench/mock_amadeus.py.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run server.py against the fake LLM and mock Amadeus.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--amadeus-url", default="http://127.0.0.1:8100")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per fake LLM call")
+    args = parser.parse_args()
+
+    # Placeholder credentials so client construction succeeds; nothing leaves the machine
+    os.environ["AMADEUS_BASE_URL"] = args.amadeus_url
+    for key in ["OPENAI_API_KEY", "TAVILY_API_KEY", "AMADEUS_CLIENT_ID", "AMADEUS_CLIENT_SECRET"]:
+        os.environ.setdefault(key, "bench")
+    # No background probes of the real OpenAI/Tavily endpoints during a run
+    os.environ["HEALTH_PROBE_INTERVAL"] = "0"
+
+    import agent_logic
+    from bench.fake_llm import ScriptedChatModel
+
+    agent_logic.agent.llm = ScriptedChatModel(latency=args.llm_latency)
+    agent_logic.agent.agent_executor = agent_logic.agent._create_agent()
+
+    from server import app
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
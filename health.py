@@ -0,0 +1,201 @@
+import os
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from observability import CIRCUIT_OPEN, UPSTREAM_UP, logger as base_logger
+
+logger = base_logger.getChild("health")
+
+# --- Circuit Breakers ---
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} is temporarily unavailable (retry in {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures; open fails fast
+    for `reset_timeout` seconds; then half-open lets one trial call through.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def retry_in(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def check(self):
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_in())
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info("circuit closed", extra={"fields": {"upstream": self.name}})
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        CIRCUIT_OPEN.labels(upstream=self.name).set(0)
+
+    def release(self):
+        """Ends a half-open trial whose outcome says nothing about the upstream."""
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning("circuit opened", extra={"fields": {"upstream": self.name, "failures": self.failures}})
+            self.opened_at = time.monotonic()
+            CIRCUIT_OPEN.labels(upstream=self.name).set(1)
+
+
+breakers: Dict[str, CircuitBreaker] = {
+    name: CircuitBreaker(name) for name in ["openai", "amadeus", "tavily"]
+}
+
+# --- Dependency Probes ---
+# Probes only check reachability and credentials, never spend API quota, and skip
+# the network entirely while a breaker is open so an outage is not made worse.
+
+PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "30"))
+PROBE_TIMEOUT = 3.0
+
+
+async def _reachable(client: httpx.AsyncClient, url: str, headers: Optional[Dict[str, str]] = None) -> str:
+    response = await client.get(url, headers=headers or {})
+    if response.status_code >= 500:
+        raise RuntimeError(f"HTTP {response.status_code}")
+    return f"HTTP {response.status_code}"
+
+
+async def probe_openai(client: httpx.AsyncClient) -> str:
+    key = os.getenv("OPENAI_API_KEY")
+    if not key:
+        raise RuntimeError("OPENAI_API_KEY not set")
+    response = await client.get("https://api.openai.com/v1/models", headers={"Authorization": f"Bearer {key}"})
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code}")
+    return "HTTP 200"
+
+
+async def probe_amadeus(client: httpx.AsyncClient) -> str:
+    if not (os.getenv("AMADEUS_CLIENT_ID") and os.getenv("AMADEUS_CLIENT_SECRET")):
+        raise RuntimeError("AMADEUS credentials not set")
+    return await _reachable(client, os.getenv("AMADEUS_BASE_URL", "https://test.api.amadeus.com"))
+
+
+async def probe_tavily(client: httpx.AsyncClient) -> str:
+    if not os.getenv("TAVILY_API_KEY"):
+        raise RuntimeError("TAVILY_API_KEY not set")
+    return await _reachable(client, "https://api.tavily.com")
+
+
+PROBES: Dict[str, Callable[[httpx.AsyncClient], Awaitable[str]]] = {
+    "openai": probe_openai,
+    "amadeus": probe_amadeus,
+    "tavily": probe_tavily,
+}
+
+# OpenAI is the only dependency without which no chat can be answered
+CRITICAL = {"openai"}
+
+
+class HealthMonitor:
+    """Runs the probes on a schedule; readers only ever see the cached results."""
+
+    def __init__(self, interval: float = PROBE_INTERVAL):
+        self.interval = interval
+        self.results: Dict[str, Dict[str, Any]] = {
+            name: {"ok": None, "detail": "not yet probed", "latency_ms": None, "checked_at": None} for name in PROBES
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    async def _probe(self, client: httpx.AsyncClient, name: str):
+        if breakers[name].state == "open":
+            self.results[name] = {**self.results[name], "ok": False, "detail": "circuit open", "checked_at": time.time()}
+            UPSTREAM_UP.labels(upstream=name).set(0)
+            return
+        start = time.perf_counter()
+        try:
+            detail = await PROBES[name](client)
+            ok = True
+        except Exception as e:
+            detail, ok = str(e)[:80] or type(e).__name__, False
+        self.results[name] = {
+            "ok": ok,
+            "detail": detail,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+            "checked_at": time.time(),
+        }
+        UPSTREAM_UP.labels(upstream=name).set(1 if ok else 0)
+
+    async def run_once(self):
+        async with httpx.AsyncClient(timeout=PROBE_TIMEOUT) as client:
+            await asyncio.gather(*(self._probe(client, name) for name in PROBES))
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("health probe cycle failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        # HEALTH_PROBE_INTERVAL=0 turns probing off (e.g. offline benchmarks); /readyz then tracks breakers only
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {**result, "circuit": breakers[name].state}
+            for name, result in self.results.items()
+        }
+
+    def ready(self) -> bool:
+        # A dependency that has not been probed yet does not block readiness
+        return all(
+            self.results[name]["ok"] is not False and breakers[name].state != "open"
+            for name in CRITICAL
+        )
+
+
+monitor = HealthMonitor()
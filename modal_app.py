@@ -14,20 +14,34 @@ image = (
         "pydantic>=2.0.0",
         "python-multipart",
         "tavily-python",
-        "amadeus"
+        "amadeus",
+        "prometheus-client",
+        "redis>=5.0.1"
     )
+    .env({
+        "WARM_CACHE_SNAPSHOT": "/cache/cache_snapshot.json",
+        "TIKTOKEN_CACHE_DIR": "/root/.tiktoken",
+    })
+    # Copied into the image (not mounted) so the warm start build step below can see it
     .add_local_dir(
         ".",
         remote_path="/root",
-        ignore=["venv", ".git", "__pycache__", ".brain", "server.log"]
+        ignore=["venv", ".git", ".env", "__pycache__", ".brain", "server.log", "warm_start.json", "cache_snapshot.json"],
+        copy=True
     )
+    # Precompute tool schemas, the system prompt and the tiktoken encoding at build time
+    .run_commands("cd /root && python warm_start.py build")
 )
 
+# Hot cache entries (routes, visa lookups) survive from one container to the next
+warm_cache = modal.Volume.from_name("sunfar-warm-cache", create_if_missing=True)
+
 app = modal.App("sunfar-elite-airline")
 
 @app.function(
     image=image,
     secrets=[modal.Secret.from_dotenv()],
+    volumes={"/cache": warm_cache},
     timeout=600
 )
 @modal.asgi_app()
@@ -0,0 +1,284 @@
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import queue
+import atexit
+import logging
+import logging.handlers
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+from langchain_core.callbacks import BaseCallbackHandler
+
+# --- Metrics ---
+# Buckets span cache hits (ms) up to the 60s agent timeout in server.py
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 60.0)
+
+REQUEST_LATENCY = Histogram(
+    "airline_request_seconds", "End-to-end request latency",
+    ["endpoint", "status"], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "airline_requests_in_flight", "Requests currently being processed", ["endpoint"],
+    multiprocess_mode="livesum"
+)
+SPAN_LATENCY = Histogram(
+    "airline_span_seconds", "Latency of traced spans (LLM, tools, Amadeus, queueing)",
+    ["span", "status"], buckets=LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter("airline_llm_tokens_total", "LLM tokens consumed", ["model", "kind"])
+TOOL_CALLS = Counter("airline_tool_calls_total", "Agent tool invocations", ["tool", "status"])
+AMADEUS_HTTP = Counter("airline_amadeus_http_total", "Amadeus HTTP responses", ["endpoint", "code"])
+AMADEUS_RETRIES = Counter("airline_amadeus_retries_total", "Amadeus retries by reason", ["reason"])
+TOOL_RESULT_TOKENS = Histogram(
+    "airline_tool_result_tokens", "Tokens in each tool result fed back to the LLM",
+    ["tool", "mode"], buckets=(16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+)
+UPSTREAM_UP = Gauge("airline_upstream_up", "Last background probe result per upstream", ["upstream"], multiprocess_mode="max")
+CIRCUIT_OPEN = Gauge("airline_circuit_open", "1 while the upstream's circuit breaker is open", ["upstream"], multiprocess_mode="max")
+
+
+def render_metrics() -> tuple:
+    """Returns (body, content_type) in the Prometheus text exposition format."""
+    # With several workers, PROMETHEUS_MULTIPROC_DIR makes every worker report the combined totals
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile, shared by the batch runner and the benchmark reports."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+_encoding: Any = None
+
+
+def load_token_encoding():
+    """Loads the tiktoken encoding. May download it, so call it at startup and off the event loop."""
+    global _encoding
+    if _encoding is not None:
+        return
+    try:
+        import tiktoken
+        _encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        _encoding = False  # e.g. offline with no cached encoding file
+
+
+def count_tokens(text: str) -> int:
+    """tiktoken count once load_token_encoding() has run, otherwise the ~4 chars/token estimate."""
+    if _encoding:
+        return len(_encoding.encode(text))
+    return max(1, len(text) // 4)
+
+# --- Tracing ---
+
+class Span:
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+        self.status = "ok"
+        self.start = time.perf_counter()
+        self.duration = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"span": self.name, "ms": round(self.duration * 1000, 2), "status": self.status, **self.attrs}
+
+
+class Trace:
+    def __init__(self, endpoint: str):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.endpoint = endpoint
+        self.spans: List[Dict[str, Any]] = []
+        self.start = time.perf_counter()
+
+    def record(self, span: Span):
+        self.spans.append(span.as_dict())
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("airline_trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def _finish_span(span: Span, trace: Optional[Trace]):
+    SPAN_LATENCY.labels(span=span.name, status=span.status).observe(span.duration)
+    if trace is not None:
+        trace.record(span)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Times a block. Safe to hold across `await`; the trace lives in the task context."""
+    s = Span(name, attrs)
+    try:
+        yield s
+    except BaseException:
+        s.status = "error"
+        raise
+    finally:
+        s.duration = time.perf_counter() - s.start
+        _finish_span(s, _current_trace.get())
+
+
+@contextmanager
+def trace_request(endpoint: str):
+    """Opens a per-request trace; every span inside the block is attached to it."""
+    trace = Trace(endpoint)
+    token = _current_trace.set(trace)
+    REQUESTS_IN_FLIGHT.labels(endpoint=endpoint).inc()
+    root = Span(endpoint, {})
+    try:
+        yield root
+    except BaseException:
+        root.status = "error"
+        raise
+    finally:
+        root.duration = time.perf_counter() - root.start
+        REQUESTS_IN_FLIGHT.labels(endpoint=endpoint).dec()
+        REQUEST_LATENCY.labels(endpoint=endpoint, status=root.status).observe(root.duration)
+        logger.info(
+            "request complete",
+            extra={"fields": {"endpoint": endpoint, "status": root.status,
+                              "ms": round(root.duration * 1000, 2), "spans": trace.spans}}
+        )
+        _current_trace.reset(token)
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """LangChain callback that turns LLM and tool runs into spans on the active trace."""
+
+    # Run in the caller's task so timings are not skewed by the executor hop
+    run_inline = True
+
+    def __init__(self, tool_output_mode: str = "markdown"):
+        self.trace = _current_trace.get()
+        self.tool_output_mode = tool_output_mode
+        self._runs: Dict[UUID, Span] = {}
+
+    def _start(self, run_id: UUID, name: str, **attrs):
+        self._runs[run_id] = Span(name, attrs)
+
+    def _end(self, run_id: UUID, status: str = "ok", **attrs) -> Optional[Span]:
+        s = self._runs.pop(run_id, None)
+        if s is None:
+            return None
+        s.status = status
+        s.attrs.update(attrs)
+        s.duration = time.perf_counter() - s.start
+        _finish_span(s, self.trace)
+        return s
+
+    # LLM runs
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs):
+        model = (kwargs.get("invocation_params") or {}).get("model_name") or (kwargs.get("invocation_params") or {}).get("model", "unknown")
+        self._start(run_id, "llm", model=model)
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs):
+        model = (kwargs.get("invocation_params") or {}).get("model_name", "unknown")
+        self._start(run_id, "llm", model=model)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+        s = self._end(run_id, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        model = s.attrs.get("model", "unknown") if s else "unknown"
+        LLM_TOKENS.labels(model=model, kind="prompt").inc(prompt_tokens)
+        LLM_TOKENS.labels(model=model, kind="completion").inc(completion_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._end(run_id, status="error", error=type(error).__name__)
+
+    # Tool runs
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs):
+        self._start(run_id, "tool", tool=serialized.get("name", "unknown"))
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs):
+        tokens = count_tokens(str(output))
+        s = self._end(run_id, result_tokens=tokens)
+        if s:
+            TOOL_CALLS.labels(tool=s.attrs["tool"], status="ok").inc()
+            TOOL_RESULT_TOKENS.labels(tool=s.attrs["tool"], mode=self.tool_output_mode).observe(tokens)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        s = self._end(run_id, status="error", error=type(error).__name__)
+        if s:
+            TOOL_CALLS.labels(tool=s.attrs["tool"], status="error").inc()
+
+# --- Structured, Non-Blocking Logging ---
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            entry["trace_id"] = trace_id
+        entry.update(getattr(record, "fields", {}) or {})
+        exc = getattr(record, "exc", None) or (self.formatException(record.exc_info) if record.exc_info else None)
+        if exc:
+            entry["exc"] = exc
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _EnqueueFormatter(logging.Formatter):
+    # QueueHandler.prepare() drops exc_info/exc_text after formatting, so the traceback travels as `exc`
+    def format(self, record: logging.LogRecord) -> str:
+        if record.exc_info:
+            record.exc = self.formatException(record.exc_info)
+        return record.getMessage()
+
+
+class _TraceIdFilter(logging.Filter):
+    # Runs on the caller's side of the queue, where the contextvar is still visible
+    def filter(self, record: logging.LogRecord) -> bool:
+        trace = _current_trace.get()
+        record.trace_id = trace.trace_id if trace else None
+        return True
+
+
+logger = logging.getLogger("airline")
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging(level: Optional[str] = None):
+    """Routes the `airline` logger through a queue so request handlers never block on stdout."""
+    global _listener
+    if _listener is not None:
+        return
+    log_queue: queue.Queue = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(_EnqueueFormatter())
+    queue_handler.addFilter(_TraceIdFilter())
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    logger.addHandler(queue_handler)
+    logger.setLevel(level or os.getenv("LOG_LEVEL", "INFO"))
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
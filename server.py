@@ -1,14 +1,20 @@
 import os
 import uvicorn
 from fastapi import FastAPI, HTTPException, Request, UploadFile, File, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Dict, Optional, Set
 import asyncio
 import json
-from agent_logic import agent
+from agent_logic import agent, amadeus
+from observability import load_token_encoding, logger as base_logger, render_metrics, trace_request
+from shared_state import state
+from health import CircuitOpenError, monitor
+from warm_start import WARM_START, save_cache_snapshot, warm_up
+
+logger = base_logger.getChild("server")
 
 app = FastAPI(title="✈️ Airline Assistant API")
 
@@ -21,30 +27,93 @@ def load_profiles() -> Dict:
             return json.load(f)
     return {}
 
-def save_profile(user_id: str, data: Dict):
+async def save_profile(user_id: str, data: Dict):
+    # A local file is invisible to other replicas, so use the shared backend when there is one
+    if state.shared:
+        key = f"profile:{user_id}"
+        await state.set(key, {**(await state.get(key) or {}), **data})
+        return
     profiles = load_profiles()
     profiles[user_id] = {**profiles.get(user_id, {}), **data}
     with open(PROFILE_FILE, "w") as f:
         json.dump(profiles, f, indent=2)
 
 # --- WebSocket Management ---
+NOTIFICATION_CHANNEL = "notifications"
+
 class ConnectionManager:
+    """
+    Tracks this process's sockets. Broadcasts go through the shared backend's
+    pub/sub so clients connected to any worker or replica receive them.
+    """
     def __init__(self):
         self.active_connections: List[WebSocket] = []
+        self._listener: Optional[asyncio.Task] = None
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        if websocket in self.active_connections:
+            self.active_connections.remove(websocket)
 
     async def broadcast(self, message: Dict):
-        for connection in self.active_connections:
-            await connection.send_json(message)
+        await state.publish(NOTIFICATION_CHANNEL, message)
+
+    async def _deliver(self, message: Dict):
+        for connection in list(self.active_connections):
+            try:
+                await connection.send_json(message)
+            except Exception:
+                self.disconnect(connection)
+
+    async def _listen(self):
+        while True:
+            try:
+                async for message in state.subscribe(NOTIFICATION_CHANNEL):
+                    await self._deliver(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("notification subscription dropped, reconnecting")
+                await asyncio.sleep(1)
+
+    def start(self):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
 
 manager = ConnectionManager()
 
+@app.on_event("startup")
+async def on_startup():
+    manager.start()
+    monitor.start()
+    # Tool result token counts use the chars/4 estimate until this lands
+    await asyncio.to_thread(load_token_encoding)
+    if WARM_START:
+        app.state.warm_up_task = await warm_up()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await manager.stop()
+    await monitor.stop()
+    warm_up_task = getattr(app.state, "warm_up_task", None)
+    if warm_up_task is not None:
+        warm_up_task.cancel()
+    if WARM_START:
+        try:
+            await save_cache_snapshot()
+        except Exception:
+            logger.exception("cache snapshot save failed")
+    await amadeus.aclose()
+    await state.close()
+
 # Enable CORS for frontend development
 app.add_middleware(
     CORSMiddleware,
@@ -86,7 +155,7 @@ async def upload_endpoint(file: UploadFile = File(...)):
             "passport_number": "A12345678",
             "valid_until": "2030-01-01"
         }
-        save_profile("default_user", {"passport": extracted})
+        await save_profile("default_user", {"passport": extracted})
         
         return {
             "status": "success",
@@ -99,35 +168,57 @@ async def upload_endpoint(file: UploadFile = File(...)):
 @app.post("/chat")
 async def chat_endpoint(request: ChatRequest, fast_req: Request):
     user_agent = fast_req.headers.get("user-agent", "Unknown")
-    print(f"📥 REQUEST FROM: {user_agent[:50]}")
-    print(f"   MESSAGE: {request.message}")
-    try:
+    with trace_request("chat") as root:
         # Simple history formatting for the agent
         history_list = [{"role": msg.role, "content": msg.content} for msg in request.history] if request.history else []
-        print(f"   HISTORY DEPTH: {len(history_list)}")
-        
-        # Add a timeout to the entire agent processing to prevent hung requests
-        response_text = await asyncio.wait_for(agent.get_response(request.message, history_list), timeout=60.0)
-        
-        print(f"📤 Sending response: {response_text[:50]}...")
-        return {
-            "response": response_text,
-            "status": "success"
-        }
-    except asyncio.TimeoutError:
-        print("❌ Agent processing timed out.")
-        return {
-            "response": "⏳ I apologize, but the search is taking longer than usual. Please refresh the page or contact our hotline directly (01-8243993) for instant help!",
-            "status": "error"
-        }
-    except Exception as e:
-        import traceback
-        print(f"❌ CRITICAL ERROR in chat endpoint: {str(e)}")
-        traceback.print_exc()
-        return {
-            "response": f"⚠️ Technical difficulty: {str(e)}. Please contact developer Mr. Kyaw Zin Tun (0949567820).",
-            "status": "error"
-        }
+        logger.info("chat request", extra={"fields": {"user_agent": user_agent[:50], "history_depth": len(history_list)}})
+        try:
+            # Add a timeout to the entire agent processing to prevent hung requests
+            response_text = await asyncio.wait_for(agent.get_response(request.message, history_list), timeout=60.0)
+            return {
+                "response": response_text,
+                "status": "success"
+            }
+        except CircuitOpenError as e:
+            root.status = "circuit_open"
+            logger.warning("chat rejected, circuit open", extra={"fields": {"upstream": e.name}})
+            return {
+                "response": "⚠️ Our AI concierge is briefly unavailable. Please try again in a moment or contact our hotline directly (01-8243993) for instant help!",
+                "status": "error"
+            }
+        except asyncio.TimeoutError:
+            root.status = "timeout"
+            logger.warning("agent processing timed out")
+            return {
+                "response": "⏳ I apologize, but the search is taking longer than usual. Please refresh the page or contact our hotline directly (01-8243993) for instant help!",
+                "status": "error"
+            }
+        except Exception as e:
+            root.status = "error"
+            logger.exception("critical error in chat endpoint")
+            return {
+                "response": f"⚠️ Technical difficulty: {str(e)}. Please contact developer Mr. Kyaw Zin Tun (0949567820).",
+                "status": "error"
+            }
+
+@app.get("/healthz")
+async def healthz():
+    # Liveness: the process is up and serving; never touches upstreams
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    # Readiness: served from the background probe cache, so it costs microseconds
+    ready = monitor.ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "unavailable", "dependencies": monitor.snapshot()}
+    )
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
 
 @app.get("/")
 async def read_index():
@@ -141,4 +232,6 @@ async def get_static(filename: str):
     return JSONResponse(status_code=404, content={"message": "Not found"})
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Multiple workers need the import string; set STATE_BACKEND_URL so they share state
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run("server:app" if workers > 1 else app, host="0.0.0.0", port=8000, workers=workers)
@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+# --- Shared State Backends ---
+# Everything that must agree across `uvicorn --workers N` and Modal replicas
+# (Amadeus token, global rate limit, caches, notifications) goes through here.
+# Set STATE_BACKEND_URL=redis://host:6379/0 to share it; otherwise it is per-process.
+
+KEY_PREFIX = "airline:"
+
+
+class StateBackend:
+    """Minimal key/value, counter and pub/sub interface. Values must be JSON-serializable."""
+
+    shared = False
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, nx: bool = False) -> bool:
+        """Stores `value`. With `nx=True` only writes if the key is absent; returns whether it wrote."""
+        raise NotImplementedError
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+    async def incr(self, key: str, ttl: float) -> int:
+        """Increments a counter; the expiry is set when the counter is created."""
+        raise NotImplementedError
+
+    async def publish(self, channel: str, message: Any):
+        raise NotImplementedError
+
+    def subscribe(self, channel: str) -> AsyncIterator[Any]:
+        raise NotImplementedError
+
+    def items(self, prefix: str) -> AsyncIterator[Tuple[str, Any, Optional[float]]]:
+        """Yields (key, value, seconds_to_live) for every live key starting with `prefix`."""
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class InMemoryBackend(StateBackend):
+    """Single-process backend. Same semantics as Redis, but nothing crosses process boundaries."""
+
+    def __init__(self, sweep_interval: float = 60.0):
+        self._data: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self.sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def _sweep(self):
+        # Keys that are never read again (old rate-limit buckets, one-off routes) are only freed here
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.sweep_interval
+        for key in [k for k, (_, expires) in self._data.items() if expires is not None and expires <= now]:
+            del self._data[key]
+
+    def _live(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._live(key)
+        return entry[0] if entry else None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, nx: bool = False) -> bool:
+        self._sweep()
+        if nx and self._live(key) is not None:
+            return False
+        expires = time.monotonic() + ttl if ttl else None
+        self._data[key] = (value, expires)
+        return True
+
+    async def delete(self, key: str):
+        self._data.pop(key, None)
+
+    async def incr(self, key: str, ttl: float) -> int:
+        self._sweep()
+        entry = self._live(key)
+        if entry is None:
+            self._data[key] = (1, time.monotonic() + ttl)
+            return 1
+        self._data[key] = (entry[0] + 1, entry[1])
+        return entry[0] + 1
+
+    async def publish(self, channel: str, message: Any):
+        for q in self._subscribers.get(channel, []):
+            q.put_nowait(message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[Any]:
+        q: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(channel, []).append(q)
+        try:
+            while True:
+                yield await q.get()
+        finally:
+            self._subscribers[channel].remove(q)
+
+    async def items(self, prefix: str) -> AsyncIterator[Tuple[str, Any, Optional[float]]]:
+        for key in [k for k in self._data if k.startswith(prefix)]:
+            entry = self._live(key)
+            if entry is not None:
+                yield key, entry[0], (entry[1] - time.monotonic()) if entry[1] is not None else None
+
+
+class RedisBackend(StateBackend):
+    """
+    Redis-protocol backend (redis.asyncio). Pass `client` to run against a local
+    stand-in such as `fakeredis.aioredis.FakeRedis()` instead of a real server.
+    """
+
+    shared = True
+
+    def __init__(self, url: Optional[str] = None, client: Any = None):
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.from_url(url, decode_responses=True)
+        self.redis = client
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.redis.get(KEY_PREFIX + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, nx: bool = False) -> bool:
+        px = int(ttl * 1000) if ttl else None
+        return bool(await self.redis.set(KEY_PREFIX + key, json.dumps(value), px=px, nx=nx))
+
+    async def delete(self, key: str):
+        await self.redis.delete(KEY_PREFIX + key)
+
+    async def incr(self, key: str, ttl: float) -> int:
+        # One MULTI: the key is created with its expiry before INCR, so a crash can't leave a counter that never expires
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(KEY_PREFIX + key, 0, px=int(ttl * 1000), nx=True)
+            pipe.incr(KEY_PREFIX + key)
+            _, count = await pipe.execute()
+        return count
+
+    async def publish(self, channel: str, message: Any):
+        await self.redis.publish(KEY_PREFIX + channel, json.dumps(message))
+
+    async def subscribe(self, channel: str) -> AsyncIterator[Any]:
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(KEY_PREFIX + channel)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    yield json.loads(message["data"])
+        finally:
+            await pubsub.unsubscribe(KEY_PREFIX + channel)
+            await pubsub.aclose()
+
+    async def items(self, prefix: str) -> AsyncIterator[Tuple[str, Any, Optional[float]]]:
+        async for full_key in self.redis.scan_iter(match=KEY_PREFIX + prefix + "*"):
+            raw = await self.redis.get(full_key)
+            if raw is None:
+                continue
+            pttl = await self.redis.pttl(full_key)
+            yield full_key[len(KEY_PREFIX):], json.loads(raw), pttl / 1000 if pttl > 0 else None
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+def create_backend(url: Optional[str] = None) -> StateBackend:
+    url = url if url is not None else os.getenv("STATE_BACKEND_URL", "")
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    return InMemoryBackend()
+
+
+state = create_backend()
+
+# --- Distributed Rate Limiter ---
+
+class RateLimiter:
+    """
+    Fixed-window limiter shared through the state backend, so `limit` calls per
+    `window` seconds holds across every worker and replica, not per process.
+    """
+
+    def __init__(self, name: str, limit: int, window: float = 1.0, backend: Optional[StateBackend] = None):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.backend = backend or state
+
+    async def acquire(self):
+        while True:
+            now = time.time()
+            bucket = int(now // self.window)
+            count = await self.backend.incr(f"ratelimit:{self.name}:{bucket}", ttl=self.window * 2)
+            if count <= self.limit:
+                return
+            # Budget for this window is spent; wake up at the start of the next one
+            await asyncio.sleep((bucket + 1) * self.window - now)
+
+# --- Cache Helpers ---
+
+async def cache_get(namespace: str, key: str) -> Optional[Any]:
+    return await state.get(f"cache:{namespace}:{key}")
+
+
+async def cache_set(namespace: str, key: str, value: Any, ttl: float):
+    # A TTL of 0 disables the cache (e.g. FLIGHT_CACHE_TTL=0 for benchmarks)
+    if ttl <= 0:
+        return
+    await state.set(f"cache:{namespace}:{key}", value, ttl=ttl)
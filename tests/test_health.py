@@ -0,0 +1,83 @@
+import os
+import time
+import asyncio
+
+import pytest
+
+from health import CircuitBreaker, CircuitOpenError
+
+# Pure breaker logic; no upstream is contacted. Run with `python -m pytest tests`.
+
+
+def open_breaker(threshold: int = 2, reset_timeout: float = 0.05) -> CircuitBreaker:
+    breaker = CircuitBreaker("test", failure_threshold=threshold, reset_timeout=reset_timeout)
+    for _ in range(threshold):
+        breaker.check()
+        breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_threshold_and_fails_fast():
+    breaker = open_breaker()
+    assert breaker.state == "open"
+    try:
+        breaker.check()
+    except CircuitOpenError as e:
+        assert e.name == "test"
+    else:
+        raise AssertionError("open breaker let a call through")
+
+
+def test_half_open_allows_a_single_trial():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() is True
+
+
+def test_failed_trial_reopens():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    breaker.check()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    time.sleep(0.06)
+    assert breaker.allow() is True
+
+
+def test_released_trial_lets_the_next_call_through():
+    # A cancelled trial call (request timeout, client disconnect) must not wedge the breaker
+    breaker = open_breaker()
+    time.sleep(0.06)
+    breaker.check()
+    breaker.release()
+    assert breaker.state == "half_open"
+    assert breaker.allow() is True
+
+
+def test_cancelled_tavily_trial_releases_the_breaker(monkeypatch):
+    for key in ["OPENAI_API_KEY", "TAVILY_API_KEY", "AMADEUS_CLIENT_ID", "AMADEUS_CLIENT_SECRET"]:
+        monkeypatch.setenv(key, os.environ.get(key, "test"))
+    agent_logic = pytest.importorskip("agent_logic")
+
+    class HangingSearch:
+        async def ainvoke(self, query):
+            await asyncio.sleep(10)
+
+    breaker = open_breaker()
+    monkeypatch.setitem(agent_logic.breakers, "tavily", breaker)
+    monkeypatch.setattr(agent_logic, "tavily_search", HangingSearch())
+    time.sleep(0.06)
+
+    async def scenario():
+        call = agent_logic.travel_req_agent_tool.ainvoke({"destination": "Cancelland", "citizenship": "Testland"})
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(call, timeout=0.05)
+
+    asyncio.run(scenario())
+    assert breaker.state == "half_open"
+    assert breaker.allow() is True
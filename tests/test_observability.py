@@ -0,0 +1,37 @@
+import json
+import queue
+import logging
+import logging.handlers
+
+from observability import JsonFormatter, _EnqueueFormatter, percentile
+
+
+def test_exception_survives_the_log_queue_as_its_own_field():
+    log_queue: queue.Queue = queue.Queue()
+    handler = logging.handlers.QueueHandler(log_queue)
+    handler.setFormatter(_EnqueueFormatter())
+    log = logging.getLogger("airline.test_queue")
+    log.addHandler(handler)
+    log.propagate = False
+    try:
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            log.exception("boom %s", 1, extra={"fields": {"route": "RGN-BKK"}})
+    finally:
+        log.removeHandler(handler)
+
+    entry = json.loads(JsonFormatter().format(log_queue.get_nowait()))
+    assert entry["msg"] == "boom 1"
+    assert entry["route"] == "RGN-BKK"
+    assert entry["exc"].startswith("Traceback")
+    assert "ZeroDivisionError" in entry["exc"]
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile([], 50) == 0.0
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([3.0], 99) == 3.0
@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+import pytest
+
+from shared_state import KEY_PREFIX, InMemoryBackend, RateLimiter, RedisBackend
+
+# RedisBackend runs against an in-process fake server: `pip install pytest fakeredis`,
+# then `python -m pytest tests` from the project root.
+
+
+def run(coro_fn):
+    fakeredis = pytest.importorskip("fakeredis")
+
+    async def main():
+        backend = RedisBackend(client=fakeredis.FakeAsyncRedis(decode_responses=True))
+        try:
+            return await coro_fn(backend)
+        finally:
+            await backend.close()
+    return asyncio.run(main())
+
+
+def test_get_set_roundtrip_and_nx():
+    async def scenario(backend):
+        assert await backend.get("missing") is None
+        assert await backend.set("k", {"a": [1, 2]}) is True
+        assert await backend.get("k") == {"a": [1, 2]}
+        assert await backend.set("k", "other", nx=True) is False
+        assert await backend.get("k") == {"a": [1, 2]}
+        await backend.delete("k")
+        assert await backend.set("k", "fresh", nx=True) is True
+        assert await backend.get("k") == "fresh"
+        assert await backend.redis.get(KEY_PREFIX + "k") == '"fresh"'
+    run(scenario)
+
+
+def test_set_ttl_expires():
+    async def scenario(backend):
+        await backend.set("short", 1, ttl=0.05)
+        assert await backend.get("short") == 1
+        await asyncio.sleep(0.1)
+        assert await backend.get("short") is None
+    run(scenario)
+
+
+def test_incr_sets_expiry_once():
+    async def scenario(backend):
+        assert await backend.incr("counter", ttl=10) == 1
+        first_ttl = await backend.redis.pttl(KEY_PREFIX + "counter")
+        assert 0 < first_ttl <= 10000
+        assert await backend.incr("counter", ttl=100) == 2
+        # Later increments keep the window's original expiry
+        assert await backend.redis.pttl(KEY_PREFIX + "counter") <= first_ttl
+        await backend.redis.pexpire(KEY_PREFIX + "counter", 1)
+        await asyncio.sleep(0.05)
+        assert await backend.incr("counter", ttl=10) == 1
+    run(scenario)
+
+
+def test_publish_subscribe():
+    async def scenario(backend):
+        received = []
+
+        async def listen():
+            async for message in backend.subscribe("notify"):
+                received.append(message)
+                if len(received) == 2:
+                    return
+
+        listener = asyncio.create_task(listen())
+        # Publish only once the subscription is registered on the server
+        for _ in range(100):
+            if (await backend.redis.pubsub_numsub(KEY_PREFIX + "notify"))[0][1]:
+                break
+            await asyncio.sleep(0.01)
+        await backend.publish("notify", {"user": "u1"})
+        await backend.publish("notify", "second")
+        await asyncio.wait_for(listener, timeout=2)
+        assert received == [{"user": "u1"}, "second"]
+    run(scenario)
+
+
+def test_items_scans_prefix_with_ttl():
+    async def scenario(backend):
+        await backend.set("cache:flights:RGN:BKK", [1], ttl=60)
+        await backend.set("cache:flights:BKK:SIN", [2])
+        await backend.set("cache:visa:TH", "x", ttl=60)
+        found = {key: (value, ttl) async for key, value, ttl in backend.items("cache:flights:")}
+        assert set(found) == {"cache:flights:RGN:BKK", "cache:flights:BKK:SIN"}
+        assert found["cache:flights:RGN:BKK"][0] == [1]
+        assert 0 < found["cache:flights:RGN:BKK"][1] <= 60
+        assert found["cache:flights:BKK:SIN"] == ([2], None)
+    run(scenario)
+
+
+def test_rate_limiter_holds_extra_calls_to_next_window():
+    async def scenario(backend):
+        limiter = RateLimiter("test", limit=3, window=0.2, backend=backend)
+        # Start at the top of a window so all calls land in the same bucket
+        await asyncio.sleep(0.2 - time.time() % 0.2)
+        start = time.perf_counter()
+        for _ in range(3):
+            await limiter.acquire()
+        assert time.perf_counter() - start < 0.1
+        await limiter.acquire()
+        assert time.perf_counter() - start >= 0.1
+    run(scenario)
+
+
+def test_in_memory_backend_sweeps_keys_that_are_never_read_again():
+    async def scenario():
+        backend = InMemoryBackend(sweep_interval=0)
+        limiter = RateLimiter("test", limit=100, window=0.01, backend=backend)
+        for _ in range(50):
+            await limiter.acquire()
+            await asyncio.sleep(0.01)
+        await backend.set("cache:flights:RGN:BKK", [1], ttl=0.01)
+        await asyncio.sleep(0.03)
+        await backend.set("cache:flights:BKK:SIN", [2], ttl=60)
+        assert list(backend._data) == ["cache:flights:BKK:SIN"]
+    asyncio.run(scenario())
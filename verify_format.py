@@ -1,7 +1,7 @@
 import asyncio
 import json
 import os
-from agent_logic import flight_search_tool
+from agent_logic import flight_search_tool, render_flight_markdown
 
 async def verify_format():
     print("🧪 Verifying New Flight Output Format...")
@@ -19,6 +19,9 @@ async def verify_format():
             "origin_name": "Chiang Mai", 
             "destination_name": "Yangon"
         })
+        # In compact mode the tool returns JSON; the card is what the customer sees
+        if res.startswith("{"):
+            res = render_flight_markdown(json.loads(res)["flights"])
         print("\n--- OUTPUT START ---")
         print(res)
         print("--- OUTPUT END ---\n")
@@ -0,0 +1,150 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from observability import logger as base_logger, span
+from shared_state import state
+
+logger = base_logger.getChild("warm_start")
+
+# --- Warm Start for Serverless Containers ---
+# Build time: `python warm_start.py build` precomputes the tool JSON schemas and the
+# rendered system prompt into an artifact that AirlineAgent picks up at import.
+# Startup: warm_up() restores hot cache entries from a snapshot, then opens the
+# Amadeus/OpenAI connection pools and fetches the Amadeus token in the background.
+# Shutdown: save_cache_snapshot() writes the hot entries back for the next container.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WARM_START = os.getenv("WARM_START", "1") == "1"
+ARTIFACT_PATH = os.getenv("WARM_START_ARTIFACT", os.path.join(BASE_DIR, "warm_start.json"))
+SNAPSHOT_PATH = os.getenv("WARM_CACHE_SNAPSHOT", os.path.join(BASE_DIR, "cache_snapshot.json"))
+CONFIG_PATH = os.path.join(BASE_DIR, "config.json")
+
+# Cache namespaces worth carrying across containers (see cache_get/cache_set)
+SNAPSHOT_PREFIXES = ["cache:flights:", "cache:visa:"]
+WARM_UP_TIMEOUT = 5.0
+
+
+def config_digest() -> str:
+    try:
+        with open(CONFIG_PATH, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return ""
+
+
+def tools_signature(tools: List[Any]) -> str:
+    """Changes whenever a tool is added, removed, re-documented or its arguments change, invalidating stored schemas."""
+    parts = [f"{t.name}:{t.description}:{json.dumps(t.args, sort_keys=True, default=str)}" for t in tools]
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def load_artifact() -> Optional[Dict[str, Any]]:
+    if not WARM_START or not os.path.exists(ARTIFACT_PATH):
+        return None
+    try:
+        with open(ARTIFACT_PATH, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        logger.warning("ignoring unreadable warm start artifact", extra={"fields": {"path": ARTIFACT_PATH}})
+        return None
+
+
+def build_artifact(path: str = ARTIFACT_PATH) -> Dict[str, Any]:
+    # Client construction needs keys to exist; nothing is called at build time
+    for key in ["OPENAI_API_KEY", "TAVILY_API_KEY"]:
+        os.environ.setdefault(key, "build")
+    os.environ["WARM_START"] = "0"  # Don't seed the build from a stale artifact
+
+    from langchain_core.utils.function_calling import convert_to_openai_function
+    from observability import load_token_encoding
+    import agent_logic
+
+    # Fetches the tiktoken encoding into the image so startup loads it from disk
+    load_token_encoding()
+
+    artifact = {
+        "built_at": time.time(),
+        "config_digest": config_digest(),
+        "compact_tool_output": agent_logic.COMPACT_TOOL_OUTPUT,
+        "system_prompt": agent_logic.agent._build_system_prompt(),
+        "tools_signature": tools_signature(agent_logic.tools),
+        "tool_schemas": [convert_to_openai_function(t) for t in agent_logic.tools],
+    }
+    with open(path, "w") as f:
+        json.dump(artifact, f, ensure_ascii=False, indent=2)
+    return artifact
+
+# --- Hot Cache Snapshot ---
+
+async def save_cache_snapshot(path: str = SNAPSHOT_PATH) -> int:
+    # A shared backend (Redis) already outlives containers
+    if state.shared:
+        return 0
+    now = time.time()
+    entries = []
+    for prefix in SNAPSHOT_PREFIXES:
+        async for key, value, ttl in state.items(prefix):
+            entries.append({"key": key, "value": value, "expires_at": now + ttl if ttl else None})
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"saved_at": now, "entries": entries}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    return len(entries)
+
+
+async def restore_cache_snapshot(path: str = SNAPSHOT_PATH) -> int:
+    if state.shared or not os.path.exists(path):
+        return 0
+    with open(path, "r") as f:
+        snapshot = json.load(f)
+    now = time.time()
+    restored = 0
+    for entry in snapshot.get("entries", []):
+        ttl = entry["expires_at"] - now if entry["expires_at"] else None
+        if ttl is not None and ttl <= 0:
+            continue
+        await state.set(entry["key"], entry["value"], ttl=ttl)
+        restored += 1
+    return restored
+
+# --- Startup Hook ---
+
+async def _warm_upstreams():
+    from agent_logic import agent, amadeus
+
+    with span("warm_up_upstreams"):
+        results = await asyncio.gather(
+            asyncio.wait_for(amadeus.warm_up(), timeout=WARM_UP_TIMEOUT),
+            asyncio.wait_for(agent.warm_up(), timeout=WARM_UP_TIMEOUT),
+            return_exceptions=True,
+        )
+        failures = {name: type(r).__name__ for name, r in zip(["amadeus", "openai"], results) if isinstance(r, BaseException)}
+        logger.info("upstream warm up complete", extra={"fields": {"failures": failures}})
+
+
+async def warm_up() -> asyncio.Task:
+    """
+    Restores the cache snapshot (local disk, fast) before serving, then warms the
+    upstream connections in the background so the first requests never wait on them.
+    Returns the background task so shutdown can cancel it.
+    """
+    with span("warm_up"):
+        try:
+            restored = await restore_cache_snapshot()
+        except Exception:
+            logger.exception("cache snapshot restore failed")
+            restored = 0
+        logger.info("cache snapshot restored", extra={"fields": {"cache_entries_restored": restored}})
+    return asyncio.create_task(_warm_upstreams())
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "build":
+        print("Usage: python warm_start.py build")
+        sys.exit(2)
+    built = build_artifact()
+    print(f"✅ Warm start artifact written to {ARTIFACT_PATH} ({len(built['tool_schemas'])} tool schemas)")